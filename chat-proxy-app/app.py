@@ -1,26 +1,45 @@
+import asyncio
 import base64
-import json
 import logging
 import os
-from typing import Any
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator
 from urllib.parse import urlparse
 
 import httpx
+import orjson
 from hypha_rpc import api
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, AuthenticationError
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 _client: AsyncOpenAI | None = None
+_client_shares_pool = False
+_openai_key: str | None = None
+_setup_lock = asyncio.Lock()
+_http_client: httpx.AsyncClient | None = None
 _DEFAULT_ALLOWED_HOSTS = "beta.bioimagearchive.org,www.ebi.ac.uk,uk1s3.embassy.ebi.ac.uk,livingobjects.ebi.ac.uk"
+_KEY_CACHE_PATH = Path(
+    os.environ.get("OPENAI_KEY_CACHE_PATH", "/dev/shm/ri-scale-chat-proxy-openai-key")
+)
+_KEY_CACHE_TTL_SECONDS = 3600
+_MAX_RESPONSE_BYTES = int(os.environ.get("RESOLVE_URL_MAX_BYTES", 16 * 1024 * 1024))
+_ALLOWED_METHODS = frozenset(
+    {"GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"}
+)
 
 
-def _allowed_hosts() -> set[str]:
+def _allowed_hosts() -> frozenset[str]:
     raw_value = os.environ.get("RESOLVE_URL_ALLOWED_HOSTS", _DEFAULT_ALLOWED_HOSTS)
-    hosts = {part.strip().lower() for part in raw_value.split(",") if part.strip()}
-    return hosts
+    return frozenset(
+        part.strip().lower() for part in raw_value.split(",") if part.strip()
+    )
+
+
+_ALLOWED_HOSTS = _allowed_hosts()
 
 
 def _normalize_headers(headers: dict[str, Any] | None) -> dict[str, str]:
@@ -46,7 +65,82 @@ def _error_payload(url: str, status_code: int, error: str) -> dict[str, Any]:
     }
 
 
-async def _resolve_openai_key() -> str | None:
+def _get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, pool=5.0),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            follow_redirects=True,
+        )
+    return _http_client
+
+
+def _make_openai_http_client() -> httpx.AsyncClient:
+    # The aiohttp transport scales better under concurrent completions; fall
+    # back to the shared httpx pool when openai[aiohttp] is not installed.
+    try:
+        from openai import DefaultAioHttpClient
+
+        return DefaultAioHttpClient(timeout=httpx.Timeout(600.0, connect=10.0))
+    except (ImportError, RuntimeError) as exp:
+        logger.info(f"aiohttp transport unavailable, using httpx: {exp}")
+        return _get_http_client()
+
+
+def _read_cached_key() -> str | None:
+    try:
+        fd = os.open(_KEY_CACHE_PATH, os.O_RDONLY | os.O_NOFOLLOW)
+        with os.fdopen(fd, "r", encoding="utf-8") as handle:
+            # The cache lives in a shared tmpfs; only trust a private file we own.
+            stat = os.fstat(fd)
+            if stat.st_uid != os.getuid() or stat.st_mode & 0o077:
+                return None
+            if stat.st_mtime < time.time() - _KEY_CACHE_TTL_SECONDS:
+                return None
+            key = handle.read().strip()
+    except (OSError, ValueError):
+        return None
+    return key or None
+
+
+def _write_cached_key(key: str) -> None:
+    try:
+        fd = os.open(
+            _KEY_CACHE_PATH,
+            os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_NOFOLLOW,
+            0o600,
+        )
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            if os.fstat(fd).st_uid != os.getuid():
+                raise PermissionError("key cache file is owned by another user")
+            # O_TRUNC keeps an existing file's mode, so enforce 0600 explicitly.
+            os.fchmod(fd, 0o600)
+            handle.write(key)
+    except OSError as exp:
+        logger.warning(f"Failed to cache OPENAI_API_KEY on disk: {exp}")
+
+
+async def _invalidate_openai_key(rejected: AsyncOpenAI) -> None:
+    global _client, _openai_key
+    async with _setup_lock:
+        # A concurrent failure may already have rebuilt the client with a new key.
+        if _client is not rejected:
+            return
+        shares_pool = _client_shares_pool
+        # Drop the rejected key everywhere so the next setup() refetches the secret.
+        _client = None
+        _openai_key = None
+        try:
+            _KEY_CACHE_PATH.unlink()
+        except OSError:
+            pass
+    # The httpx fallback shares resolve_url's pool, which must stay open.
+    if not shares_pool:
+        await rejected.close()
+
+
+async def _lookup_openai_key() -> str | None:
     key = os.environ.get("OPENAI_API_KEY")
     if key:
         return key
@@ -58,16 +152,24 @@ async def _resolve_openai_key() -> str | None:
     except Exception as exp:
         logger.warning(f"Failed to read OPENAI_API_KEY via api.get_env: {exp}")
 
+    key = _read_cached_key()
+    if key:
+        return key
+
     try:
         am = await api.get_service("public/artifact-manager")
         content = await am.read_file(
             artifact_id="ri-scale/openai-secret", file_path="secret.json"
         )
-        if isinstance(content, bytes):
-            content = content.decode("utf-8")
-        payload = json.loads(content)
+        if isinstance(content, (bytes, str)):
+            payload = orjson.loads(content)
+        elif isinstance(content, dict):
+            payload = content
+        else:
+            raise TypeError(f"Unexpected secret content type: {type(content)}")
         key = payload.get("api_key")
         if isinstance(key, str) and key:
+            _write_cached_key(key)
             return key
     except Exception as exp:
         logger.warning(f"Failed artifact fallback for OPENAI_API_KEY: {exp}")
@@ -75,17 +177,49 @@ async def _resolve_openai_key() -> str | None:
     return None
 
 
-async def setup() -> dict[str, Any]:
-    global _client
-    key = await _resolve_openai_key()
-    if not key:
-        logger.error("OPENAI_API_KEY is missing")
-        _client = None
-        return {"ok": False, "error": "OPENAI_API_KEY is missing"}
+async def _read_limited_body(response: httpx.Response) -> bytes | None:
+    content_length = response.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > _MAX_RESPONSE_BYTES:
+        return None
 
-    _client = AsyncOpenAI(api_key=key)
-    logger.info("OpenAI client initialized")
-    return {"ok": True}
+    body = bytearray()
+    async for chunk in response.aiter_bytes(65536):
+        body.extend(chunk)
+        if len(body) > _MAX_RESPONSE_BYTES:
+            return None
+    return bytes(body)
+
+
+async def _resolve_openai_key() -> str | None:
+    global _openai_key
+    if _openai_key is None:
+        _openai_key = await _lookup_openai_key()
+    return _openai_key
+
+
+async def setup() -> dict[str, Any]:
+    global _client, _client_shares_pool
+    # Hypha calls setup() at start-up, which can overlap the first request.
+    async with _setup_lock:
+        key = await _resolve_openai_key()
+        if not key:
+            logger.error("OPENAI_API_KEY is missing")
+            _client = None
+            return {"ok": False, "error": "OPENAI_API_KEY is missing"}
+
+        if _client is not None:
+            return {"ok": True}
+
+        http_client = _make_openai_http_client()
+        _client_shares_pool = http_client is _http_client
+        _client = AsyncOpenAI(
+            api_key=key,
+            http_client=http_client,
+            timeout=httpx.Timeout(600.0, connect=10.0),
+            max_retries=2,
+        )
+        logger.info("OpenAI client initialized")
+        return {"ok": True}
 
 
 async def resolve_url(
@@ -105,7 +239,7 @@ async def resolve_url(
     if parsed.scheme.lower() != "https":
         return _error_payload(str(url), 400, "Only https URLs are allowed")
 
-    if host not in _allowed_hosts():
+    if host not in _ALLOWED_HOSTS:
         return _error_payload(
             str(url),
             403,
@@ -113,7 +247,7 @@ async def resolve_url(
         )
 
     method_value = str(method or "GET").upper()
-    if method_value not in {"GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"}:
+    if method_value not in _ALLOWED_METHODS:
         return _error_payload(str(url), 400, f"Unsupported method: {method_value}")
 
     request_headers = _normalize_headers(headers)
@@ -125,6 +259,7 @@ async def resolve_url(
         "method": method_value,
         "url": str(url),
         "headers": request_headers,
+        "timeout": timeout_seconds,
     }
     if body is not None:
         if isinstance(body, (dict, list)):
@@ -133,14 +268,19 @@ async def resolve_url(
             request_kwargs["content"] = str(body)
 
     try:
-        async with httpx.AsyncClient(
-            timeout=timeout_seconds, follow_redirects=True
-        ) as client:
-            response = await client.request(**request_kwargs)
+        async with _get_http_client().stream(**request_kwargs) as response:
+            raw = await _read_limited_body(response)
     except Exception as exp:
         logger.warning("resolve_url failed for %s: %s", url, exp)
         return _error_payload(str(url), 502, str(exp))
 
+    if raw is None:
+        return _error_payload(
+            str(url),
+            413,
+            f"Upstream response exceeds {_MAX_RESPONSE_BYTES} bytes",
+        )
+
     result: dict[str, Any] = {
         "ok": 200 <= int(response.status_code) < 300,
         "status_code": int(response.status_code),
@@ -151,14 +291,14 @@ async def resolve_url(
     content_type = response.headers.get("content-type", "")
     if "application/json" in content_type.lower():
         try:
-            result["json"] = response.json()
-        except Exception:
-            result["text"] = response.text
+            result["json"] = orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            result["text"] = raw.decode("utf-8", errors="replace")
     elif content_type.lower().startswith("image/") or "octet-stream" in content_type.lower():
-        result["base64"] = base64.b64encode(response.content).decode("ascii")
+        result["base64"] = base64.b64encode(raw).decode("ascii")
         result["content_type"] = content_type
     else:
-        result["text"] = response.text
+        result["text"] = raw.decode(response.encoding or "utf-8", errors="replace")
 
     if not result["ok"]:
         result["error"] = f"Upstream returned HTTP {response.status_code}"
@@ -166,6 +306,27 @@ async def resolve_url(
     return result
 
 
+async def _ensure_client() -> bool:
+    if _client is not None:
+        return True
+    setup_result = await setup()
+    return bool(setup_result.get("ok"))
+
+
+def _completion_kwargs(
+    messages: list[dict[str, Any]],
+    tools: list[dict[str, Any]] | None,
+    tool_choice: dict[str, Any] | str | None,
+    model: str,
+) -> dict[str, Any]:
+    kwargs: dict[str, Any] = {"model": model, "messages": messages}
+    if tools:
+        kwargs["tools"] = tools
+    if tool_choice:
+        kwargs["tool_choice"] = tool_choice
+    return kwargs
+
+
 async def chat_completion(
     messages: list[dict[str, Any]],
     tools: list[dict[str, Any]] | None = None,
@@ -173,33 +334,67 @@ async def chat_completion(
     model: str = "gpt-5-mini",
     context: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
-    global _client
-
-    if _client is None:
-        setup_result = await setup()
-        if not setup_result.get("ok"):
-            return {"error": "Server is missing OpenAI API Key."}
+    if not await _ensure_client():
+        return {"error": "Server is missing OpenAI API Key."}
 
-    assert _client is not None
+    client = _client
+    assert client is not None
     try:
-        kwargs: dict[str, Any] = {"model": model, "messages": messages}
-        if tools:
-            kwargs["tools"] = tools
-        if tool_choice:
-            kwargs["tool_choice"] = tool_choice
-
-        response = await _client.chat.completions.create(**kwargs)
-        return json.loads(response.model_dump_json())
+        kwargs = _completion_kwargs(messages, tools, tool_choice, model)
+        response = await client.chat.completions.create(**kwargs)
+        return response.model_dump(mode="json")
+    except AuthenticationError as exp:
+        logger.error(f"OpenAI rejected the API key, clearing cached key: {exp}")
+        await _invalidate_openai_key(client)
+        return {"error": str(exp)}
     except Exception as exp:
         logger.error(f"OpenAI call failed: {exp}")
         return {"error": str(exp)}
 
 
+async def chat_completion_stream(
+    messages: list[dict[str, Any]],
+    tools: list[dict[str, Any]] | None = None,
+    tool_choice: dict[str, Any] | str | None = None,
+    model: str = "gpt-5-mini",
+    context: dict[str, Any] | None = None,
+) -> AsyncIterator[dict[str, Any]]:
+    if not await _ensure_client():
+        yield {"error": "Server is missing OpenAI API Key."}
+        return
+
+    client = _client
+    assert client is not None
+    try:
+        kwargs = _completion_kwargs(messages, tools, tool_choice, model)
+        stream = await client.chat.completions.create(**kwargs, stream=True)
+    except AuthenticationError as exp:
+        logger.error(f"OpenAI rejected the API key, clearing cached key: {exp}")
+        await _invalidate_openai_key(client)
+        yield {"error": str(exp)}
+        return
+    except Exception as exp:
+        logger.error(f"OpenAI stream failed to start: {exp}")
+        yield {"error": str(exp)}
+        return
+
+    try:
+        async for chunk in stream:
+            yield chunk.model_dump(mode="json")
+    except Exception as exp:
+        logger.error(f"OpenAI stream failed: {exp}")
+        yield {"error": str(exp)}
+    finally:
+        # Release the pooled connection even if the caller stops early.
+        await stream.close()
+
+
 api.export(
     {
         "config": {"visibility": "public"},
         "setup": setup,
         "chat_completion": chat_completion,
+        "chat_completion_stream": chat_completion_stream,
         "resolve_url": resolve_url,
     }
 )
@@ -1,6 +1,13 @@
+import asyncio
+import copy
+import inspect
 import json
 import re
-from typing import Any, Dict, List
+import time
+from collections import OrderedDict
+from functools import lru_cache, partial, wraps
+from itertools import islice
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
 from urllib.parse import quote
 
 import httpx
@@ -10,9 +17,15 @@ try:
 except Exception:
     js = None
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
 
 BASE_SEARCH_URL = "https://beta.bioimagearchive.org/search/search/fts"
 BASE_IMAGE_SEARCH_URL = "https://beta.bioimagearchive.org/search/search/fts/image"
+BASE_URL_BY_KIND = {"datasets": BASE_SEARCH_URL, "images": BASE_IMAGE_SEARCH_URL}
 STOPWORDS = {
     "and",
     "or",
@@ -40,6 +53,19 @@ DATASET_TITLE_MAX_LEN = 220
 DATASET_DESCRIPTION_MAX_LEN = 480
 IMAGE_TITLE_MAX_LEN = 220
 IMAGE_FILE_PATTERN_MAX_LEN = 260
+STUDY_URL_PREFIX = "https://beta.bioimagearchive.org/bioimage-archive/study/"
+SEARCH_CACHE_MAX_ENTRIES = 512
+SEARCH_CACHE_TTL_SECONDS = 120.0
+
+_QUERY_NEEDS_QUOTING = re.compile(r'[^A-Za-z0-9 _.~"()\[\]{}:*?+\-/\\]')
+_WORD_RE = re.compile(r"\w+")
+
+_http_client: httpx.AsyncClient | None = None
+_EMPTY_DICT: Dict[str, Any] = {}
+_search_cache: "OrderedDict[Tuple[Any, ...], Tuple[float, Dict[str, Any]]]" = (
+    OrderedDict()
+)
+_inflight_searches: Dict[Tuple[Any, ...], "asyncio.Future[Dict[str, Any]]"] = {}
 
 
 def _short_text(value: Any, max_len: int = 180) -> str:
@@ -47,11 +73,77 @@ def _short_text(value: Any, max_len: int = 180) -> str:
     return text if len(text) <= max_len else (text[: max_len - 3] + "...")
 
 
+@lru_cache(maxsize=256)
 def _build_url(base_url: str, query: str) -> str:
+    if not _QUERY_NEEDS_QUOTING.search(query):
+        return f"{base_url}?query={query.replace(' ', '%20')}"
     encoded = quote(query, safe='"()[]{}:*?+-/\\')
     return f"{base_url}?query={encoded}"
 
 
+def _get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=40, max_keepalive_connections=20),
+        )
+    return _http_client
+
+
+def _search_cache_get(key: Tuple[Any, ...]) -> Dict[str, Any] | None:
+    entry = _search_cache.get(key)
+    if entry is None:
+        return None
+    stored_at, payload = entry
+    if time.monotonic() - stored_at > SEARCH_CACHE_TTL_SECONDS:
+        del _search_cache[key]
+        return None
+    _search_cache.move_to_end(key)
+    return copy.deepcopy(payload)
+
+
+def _search_cache_put(key: Tuple[Any, ...], payload: Dict[str, Any]) -> None:
+    _search_cache[key] = (time.monotonic(), copy.deepcopy(payload))
+    _search_cache.move_to_end(key)
+    while len(_search_cache) > SEARCH_CACHE_MAX_ENTRIES:
+        _search_cache.popitem(last=False)
+
+
+def _finish_search(
+    key: Tuple[Any, ...], future: "asyncio.Future[Dict[str, Any]]"
+) -> None:
+    _inflight_searches.pop(key, None)
+    if not future.cancelled() and future.exception() is None:
+        _search_cache_put(key, future.result())
+
+
+def _cached_search(
+    func: Callable[..., Awaitable[Dict[str, Any]]],
+) -> Callable[..., Awaitable[Dict[str, Any]]]:
+    # Keyed on the bound arguments so positional and keyword calls share entries.
+    signature = inspect.signature(func)
+
+    @wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = (func.__name__, *bound.arguments.values())
+        cached = _search_cache_get(key)
+        if cached is not None:
+            return cached
+        # Concurrent identical searches wait on the first one instead of
+        # repeating its fallback and enrichment queries.
+        pending = _inflight_searches.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(func(*args, **kwargs))
+            _inflight_searches[key] = pending
+            pending.add_done_callback(partial(_finish_search, key))
+        return copy.deepcopy(await asyncio.shield(pending))
+
+    return wrapper
+
+
 def _query_terms(query: str) -> List[str]:
     terms: List[str] = []
     for token in re.findall(r"[A-Za-z0-9]+", query.lower()):
@@ -64,21 +156,27 @@ def _query_terms(query: str) -> List[str]:
     return terms
 
 
+@lru_cache(maxsize=1024)
+def _lowered_words(text: str) -> Tuple[str, frozenset[str]]:
+    # A term is a whole-word match exactly when it is one of the \w+ runs.
+    lowered = text.lower()
+    return lowered, frozenset(_WORD_RE.findall(lowered))
+
+
 def _dataset_relevance_score(item: Dict[str, Any], query_terms: List[str]) -> float:
     title = item.get("title") if isinstance(item.get("title"), str) else ""
     description = item.get("description") if isinstance(item.get("description"), str) else ""
     accession = item.get("accession") if isinstance(item.get("accession"), str) else ""
 
-    title_lower = title.lower()
-    description_lower = description.lower()
+    title_lower, title_words = _lowered_words(title)
+    description_lower, description_words = _lowered_words(description)
     accession_lower = accession.lower()
 
     score = 0.0
     term_hits = 0
     for term in query_terms:
-        term_re = re.compile(rf"\\b{re.escape(term)}\\b", re.IGNORECASE)
-        in_title = bool(term_re.search(title_lower))
-        in_desc = bool(term_re.search(description_lower))
+        in_title = term in title_words
+        in_desc = term in description_words
         if in_title:
             score += 6.0
             term_hits += 1
@@ -170,12 +268,8 @@ def _extract_hits_and_total(
         hits_list = hits_value.get("hits", [])
         if not isinstance(hits_list, list):
             hits_list = []
-        total_obj = (
-            hits_value.get("total", {})
-            if isinstance(hits_value.get("total"), dict)
-            else {}
-        )
-        total = total_obj.get("value") if isinstance(total_obj, dict) else None
+        total_obj = _as_dict(hits_value.get("total")) or _EMPTY_DICT
+        total = total_obj.get("value")
         if not isinstance(total, int):
             total = len(hits_list)
         return hits_list, total
@@ -183,12 +277,23 @@ def _extract_hits_and_total(
     return [], 0
 
 
-def _first_nonempty_string(values: List[Any]) -> str | None:
+def _as_str(value: Any) -> str | None:
+    return value if type(value) is str else None
+
+
+def _as_dict(value: Any) -> Dict[str, Any] | None:
+    return value if type(value) is dict else None
+
+
+def _first_nonempty_string(*values: Any) -> str | None:
     for value in values:
-        if isinstance(value, str):
-            cleaned = value.strip()
-            if cleaned:
-                return cleaned
+        if type(value) is not str or not value:
+            continue
+        if not value[0].isspace() and not value[-1].isspace():
+            return value
+        cleaned = value.strip()
+        if cleaned:
+            return cleaned
     return None
 
 
@@ -210,60 +315,38 @@ def _metadata_value(
 
 
 def _dataset_result_from_hit(item: Dict[str, Any]) -> Dict[str, Any]:
-    source_payload = (
-        item.get("_source") if isinstance(item.get("_source"), dict) else item
-    )
+    source_payload = _as_dict(item.get("_source")) or item
 
     accession = _first_nonempty_string(
-        [
-            source_payload.get("accession_id"),
-            source_payload.get("accession"),
-            source_payload.get("id"),
-            item.get("_id"),
-        ]
+        source_payload.get("accession_id"),
+        source_payload.get("accession"),
+        source_payload.get("id"),
+        item.get("_id"),
     )
     title = (
         _first_nonempty_string(
-            [
-                source_payload.get("title"),
-                source_payload.get("name"),
-                source_payload.get("dataset"),
-                accession,
-                source_payload.get("uuid"),
-                item.get("_id"),
-            ]
+            source_payload.get("title"),
+            source_payload.get("name"),
+            source_payload.get("dataset"),
+            accession,
+            source_payload.get("uuid"),
+            item.get("_id"),
         )
         or "Untitled"
     )
-    description_value = (
-        source_payload.get("description")
-        if isinstance(source_payload.get("description"), str)
-        else None
-    )
+    description_value = _as_str(source_payload.get("description"))
 
     return {
         "title": _short_text(title, DATASET_TITLE_MAX_LEN),
         "accession": accession or "",
-        "url": (
-            f"https://beta.bioimagearchive.org/bioimage-archive/study/{accession}"
-            if accession
-            else None
-        ),
+        "url": STUDY_URL_PREFIX + accession if accession else None,
         "description": (
             _short_text(description_value, DATASET_DESCRIPTION_MAX_LEN)
-            if isinstance(description_value, str)
-            else None
-        ),
-        "doi": (
-            source_payload.get("doi")
-            if isinstance(source_payload.get("doi"), str)
-            else None
-        ),
-        "release_date": (
-            source_payload.get("release_date")
-            if isinstance(source_payload.get("release_date"), str)
+            if description_value is not None
             else None
         ),
+        "doi": _as_str(source_payload.get("doi")),
+        "release_date": _as_str(source_payload.get("release_date")),
         "score": item.get("_score"),
     }
 
@@ -288,57 +371,37 @@ def _compact_dataset_result(item: Dict[str, Any]) -> Dict[str, Any]:
 
 
 def _image_result_from_hit(item: Dict[str, Any]) -> Dict[str, Any]:
-    source_payload = (
-        item.get("_source") if isinstance(item.get("_source"), dict) else item
-    )
+    source_payload = _as_dict(item.get("_source")) or item
     file_pattern_payload = _metadata_value(source_payload, "file_pattern")
     file_pattern = (
-        file_pattern_payload.get("file_pattern")
-        if isinstance(file_pattern_payload, dict)
+        _as_str(file_pattern_payload.get("file_pattern"))
+        if file_pattern_payload is not None
         else None
     )
 
-    creation_process = (
-        source_payload.get("creation_process")
-        if isinstance(source_payload.get("creation_process"), dict)
-        else {}
-    )
-    acquisition_process = (
-        creation_process.get("acquisition_process")
-        if isinstance(creation_process.get("acquisition_process"), list)
-        else []
-    )
+    creation_process = _as_dict(source_payload.get("creation_process")) or _EMPTY_DICT
+    acquisition_process = creation_process.get("acquisition_process")
     first_acquisition = (
-        acquisition_process[0]
-        if acquisition_process and isinstance(acquisition_process[0], dict)
-        else {}
-    )
-    acquisition_title = (
-        first_acquisition.get("title")
-        if isinstance(first_acquisition.get("title"), str)
+        _as_dict(acquisition_process[0])
+        if type(acquisition_process) is list and acquisition_process
         else None
-    )
+    ) or _EMPTY_DICT
+    acquisition_title = _as_str(first_acquisition.get("title"))
 
     accession = _first_nonempty_string(
-        [
-            source_payload.get("accession_id"),
-            source_payload.get("accession"),
-            source_payload.get("study_accession"),
-        ]
-    )
-    image_id = (
-        _first_nonempty_string([source_payload.get("uuid"), item.get("_id")]) or ""
+        source_payload.get("accession_id"),
+        source_payload.get("accession"),
+        source_payload.get("study_accession"),
     )
+    image_id = _first_nonempty_string(source_payload.get("uuid"), item.get("_id")) or ""
     title = (
         _first_nonempty_string(
-            [
-                source_payload.get("title"),
-                source_payload.get("name"),
-                source_payload.get("label"),
-                file_pattern if isinstance(file_pattern, str) else None,
-                acquisition_title,
-                image_id,
-            ]
+            source_payload.get("title"),
+            source_payload.get("name"),
+            source_payload.get("label"),
+            file_pattern,
+            acquisition_title,
+            image_id,
         )
         or "Untitled"
     )
@@ -347,17 +410,9 @@ def _image_result_from_hit(item: Dict[str, Any]) -> Dict[str, Any]:
         "id": image_id,
         "accession": accession or "",
         "title": title,
-        "study_url": (
-            f"https://beta.bioimagearchive.org/bioimage-archive/study/{accession}"
-            if accession
-            else None
-        ),
-        "dataset_uuid": (
-            source_payload.get("submission_dataset_uuid")
-            if isinstance(source_payload.get("submission_dataset_uuid"), str)
-            else None
-        ),
-        "file_pattern": file_pattern if isinstance(file_pattern, str) else None,
+        "study_url": STUDY_URL_PREFIX + accession if accession else None,
+        "dataset_uuid": _as_str(source_payload.get("submission_dataset_uuid")),
+        "file_pattern": file_pattern,
         "acquisition_title": acquisition_title,
         "score": item.get("_score"),
     }
@@ -391,7 +446,7 @@ def _format_dataset_assistant_summary(payload: Dict[str, Any], max_items: int =
         )
 
     lines = [f"Here are up to {max_items} BioImage Archive dataset matches:"]
-    for idx, entry in enumerate(result_list[:max_items], start=1):
+    for idx, entry in enumerate(islice(result_list, max_items), start=1):
         if not isinstance(entry, dict):
             continue
         title = entry.get("title") if isinstance(entry.get("title"), str) else "Untitled"
@@ -432,7 +487,7 @@ def _normalize_search_payload(
     ranked_items = result_items
     if kind == "datasets":
         ranked_items = _rerank_dataset_results(result_items, query)
-    for entry in ranked_items[:result_limit]:
+    for entry in islice(ranked_items, result_limit):
         if not isinstance(entry, dict):
             continue
         if kind == "datasets":
@@ -447,8 +502,7 @@ def _normalize_search_payload(
     if isinstance(payload_url, str) and payload_url.strip():
         url = payload_url
     else:
-        base_url = BASE_SEARCH_URL if kind == "datasets" else BASE_IMAGE_SEARCH_URL
-        url = _build_url(base_url, query)
+        url = _build_url(BASE_URL_BY_KIND[kind], query)
 
     normalized: Dict[str, Any] = {
         "query": query,
@@ -476,7 +530,7 @@ async def _search_via_proxy(kind: str, query: str, limit: int) -> Dict[str, Any]
         if hasattr(result, "to_py"):
             result = result.to_py()
         if isinstance(result, str):
-            parsed = json.loads(result)
+            parsed = _json_loads(result)
             if isinstance(parsed, dict):
                 return parsed
             return {"error": "Proxy returned non-dict response"}
@@ -520,15 +574,14 @@ async def _search_datasets_once(query: str, safe_limit: int) -> Dict[str, Any]:
         return _normalize_search_payload("datasets", query, safe_limit, proxied)
 
     url = _build_url(BASE_SEARCH_URL, query)
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.get(url)
-        response.raise_for_status()
-        payload = response.json()
+    response = await _get_http_client().get(url)
+    response.raise_for_status()
+    payload = _json_loads(response.content)
 
     hits, total = _extract_hits_and_total(payload)
     top_hits: List[Dict[str, Any]] = []
 
-    for item in hits[:fetch_limit]:
+    for item in islice(hits, fetch_limit):
         if isinstance(item, dict):
             top_hits.append(_dataset_result_from_hit(item))
 
@@ -541,6 +594,7 @@ async def _search_datasets_once(query: str, safe_limit: int) -> Dict[str, Any]:
     return _normalize_search_payload("datasets", query, safe_limit, raw_payload)
 
 
+@_cached_search
 async def search_datasets(query: str, limit: int = 10) -> Dict[str, Any]:
     """
     Search BioImage Archive datasets by full-text query.
@@ -562,11 +616,23 @@ async def search_datasets(query: str, limit: int = 10) -> Dict[str, Any]:
             f"DEBUG: search_datasets primary query returned total={primary_result.get('total', 0)}"
         )
         if not _has_strong_match(primary_list, query) and len(_query_terms(query)) >= 2:
-            for term in _fallback_candidate_terms(query)[:4]:
+            enrichment_terms = _fallback_candidate_terms(query)[:4]
+            for term in enrichment_terms:
                 print(
                     f"DEBUG: search_datasets enrichment query='{term}' after weak relevance in primary query='{query}'"
                 )
-                enrichment_result = await _search_datasets_once(term, safe_limit)
+            # Fetch every term at once, then keep the first strong merge in
+            # term order, as the sequential loop did.
+            enrichment_results = await asyncio.gather(
+                *(_search_datasets_once(term, safe_limit) for term in enrichment_terms),
+                return_exceptions=True,
+            )
+            for term, enrichment_result in zip(enrichment_terms, enrichment_results):
+                if isinstance(enrichment_result, BaseException):
+                    print(
+                        f"DEBUG: search_datasets enrichment query='{term}' failed: {enrichment_result}"
+                    )
+                    continue
                 enrichment_items = enrichment_result.get("results")
                 enrichment_list = (
                     enrichment_items if isinstance(enrichment_items, list) else []
@@ -583,11 +649,25 @@ async def search_datasets(query: str, limit: int = 10) -> Dict[str, Any]:
     if len(fallback_candidates) >= 1:
         merged_results: List[Dict[str, Any]] = []
         fallback_terms_used: List[str] = []
-        for term in fallback_candidates[:4]:
+        fallback_terms = fallback_candidates[:4]
+        for term in fallback_terms:
             print(
                 f"DEBUG: search_datasets fallback query='{term}' after empty primary query='{query}'"
             )
-            fallback_result = await _search_datasets_once(term, safe_limit)
+        # A flaky term must not discard the other terms' results.
+        fallback_results = await asyncio.gather(
+            *(_search_datasets_once(term, safe_limit) for term in fallback_terms),
+            return_exceptions=True,
+        )
+        failures = [r for r in fallback_results if isinstance(r, BaseException)]
+        if len(failures) == len(fallback_results):
+            raise failures[0]
+        for term, fallback_result in zip(fallback_terms, fallback_results):
+            if isinstance(fallback_result, BaseException):
+                print(
+                    f"DEBUG: search_datasets fallback query='{term}' failed: {fallback_result}"
+                )
+                continue
             fallback_items = fallback_result.get("results")
             fallback_list = fallback_items if isinstance(fallback_items, list) else []
             if fallback_list:
@@ -613,6 +693,7 @@ async def search_datasets(query: str, limit: int = 10) -> Dict[str, Any]:
     return primary_result
 
 
+@_cached_search
 async def search_images(query: str, limit: int = 10) -> Dict[str, Any]:
     """
     Search BioImage Archive images endpoint by full-text query.
@@ -632,15 +713,14 @@ async def search_images(query: str, limit: int = 10) -> Dict[str, Any]:
         return _normalize_search_payload("images", query, safe_limit, proxied)
 
     url = _build_url(BASE_IMAGE_SEARCH_URL, query)
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.get(url)
-        response.raise_for_status()
-        payload = response.json()
+    response = await _get_http_client().get(url)
+    response.raise_for_status()
+    payload = _json_loads(response.content)
 
     hits, total = _extract_hits_and_total(payload)
     top_hits: List[Dict[str, Any]] = []
 
-    for item in hits[: max(1, safe_limit)]:
+    for item in islice(hits, max(1, safe_limit)):
         if isinstance(item, dict):
             top_hits.append(_image_result_from_hit(item))
 
@@ -678,7 +758,7 @@ def explain_advanced_query_syntax() -> str:
 
 def _sample_titles(items: List[Dict[str, Any]], max_items: int = 3) -> List[str]:
     titles: List[str] = []
-    for item in items[:max_items]:
+    for item in islice(items, max_items):
         title = item.get("title")
         if isinstance(title, str) and title.strip():
             titles.append(title.strip())
@@ -692,18 +772,23 @@ async def _probe_beta_index() -> List[str]:
         ("datasets", "cancer", search_datasets),
         ("images", "tumor", search_images),
     ]
+    payloads = await asyncio.gather(
+        *(fn(query, limit=3) for _, query, fn in probes), return_exceptions=True
+    )
     lines: List[str] = []
-    for kind, query, fn in probes:
-        try:
-            payload = await fn(query, limit=3)
-            total = payload.get("total", 0)
-            total_int = total if isinstance(total, int) else 0
-            results = payload.get("results")
-            top_results = results if isinstance(results, list) else []
-            titles = _sample_titles(top_results)
-            lines.append(f"{kind}:{query} -> total={total_int}, sample_titles={titles}")
-        except Exception as exc:
-            lines.append(f"{kind}:{query} -> error={exc}")
+    for (kind, query, _), payload in zip(probes, payloads):
+        if isinstance(payload, Exception):
+            lines.append(f"{kind}:{query} -> error={payload}")
+            continue
+        if isinstance(payload, BaseException):
+            # Cancellation is not a probe failure; let it propagate.
+            raise payload
+        total = payload.get("total", 0)
+        total_int = total if isinstance(total, int) else 0
+        results = payload.get("results")
+        top_results = results if isinstance(results, list) else []
+        titles = _sample_titles(top_results)
+        lines.append(f"{kind}:{query} -> total={total_int}, sample_titles={titles}")
     return lines
 
 
@@ -11,9 +11,16 @@ if not importlib.util.find_spec("numcodecs"):
 if _to_install:
     await micropip.install(_to_install)
 
+import asyncio
+import copy
+import inspect
 import json
 import re
-from typing import Any, Dict, List
+import time
+from collections import OrderedDict
+from functools import lru_cache, partial, wraps
+from itertools import chain, islice
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
 from urllib.parse import quote
 
 import httpx
@@ -23,77 +30,241 @@ try:
 except Exception:
     js = None
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
 
 BASE_SEARCH_URL = "https://beta.bioimagearchive.org/search/v1/search/fts"
 BASE_IMAGE_SEARCH_URL = "https://beta.bioimagearchive.org/search/v1/search/fts/image"
-STOPWORDS = {
-    "and",
-    "or",
-    "not",
-    "the",
-    "a",
-    "an",
-    "of",
-    "for",
-    "with",
-    "in",
-    "on",
-    "to",
-    "please",
-    "give",
-    "me",
-    "find",
-    "show",
-    "get",
-    "dataset",
-    "datasets",
-}
+BASE_URL_BY_KIND = {"datasets": BASE_SEARCH_URL, "images": BASE_IMAGE_SEARCH_URL}
+STOPWORDS = frozenset(
+    {
+        "and",
+        "or",
+        "not",
+        "the",
+        "a",
+        "an",
+        "of",
+        "for",
+        "with",
+        "in",
+        "on",
+        "to",
+        "please",
+        "give",
+        "me",
+        "find",
+        "show",
+        "get",
+        "dataset",
+        "datasets",
+    }
+)
 
 DATASET_TITLE_MAX_LEN = 220
 DATASET_DESCRIPTION_MAX_LEN = 480
 IMAGE_TITLE_MAX_LEN = 220
 IMAGE_FILE_PATTERN_MAX_LEN = 260
+# (key, default when missing or not a string, max length or None)
+_DATASET_COMPACT_SCHEMA = (
+    ("accession", "", None),
+    ("url", None, None),
+    ("description", None, DATASET_DESCRIPTION_MAX_LEN),
+    ("doi", None, None),
+    ("release_date", None, None),
+    ("thumbnail_url", None, None),
+)
+_IMAGE_COMPACT_SCHEMA = (
+    ("id", "", None),
+    ("accession", "", None),
+    ("study_url", None, None),
+    ("file_pattern", None, IMAGE_FILE_PATTERN_MAX_LEN),
+)
+QUERY_SAFE_CHARS = '"()[]{}:*?+-/\\'
+SEARCH_CACHE_MAX_ENTRIES = 512
+SEARCH_CACHE_TTL_SECONDS = 120.0
+
+HYPHA_SERVER_URL = "https://hypha.aicell.io"
+HYPHA_SERVICE_TIMEOUT_SECONDS = 30.0
+HYPHA_SERVICE_ATTEMPTS = 2
+STUDY_URL_PREFIX = "https://beta.bioimagearchive.org/bioimage-archive/study/"
+
+_http_client: httpx.AsyncClient | None = None
+_hypha_server: Any = None
+_hypha_services: Dict[str, Any] = {}
+_hypha_lock = asyncio.Lock()
+_search_cache: "OrderedDict[Tuple[Any, ...], Tuple[float, Dict[str, Any]]]" = (
+    OrderedDict()
+)
+_inflight_requests: Dict[str, "asyncio.Future[Any]"] = {}
+_inflight_searches: Dict[Tuple[Any, ...], "asyncio.Future[Dict[str, Any]]"] = {}
+_EMPTY_DICT: Dict[str, Any] = {}
 
 
 def _short_text(value: Any, max_len: int = 180) -> str:
-    text = str(value) if value is not None else ""
-    return text if len(text) <= max_len else (text[: max_len - 3] + "...")
+    if type(value) is str:
+        text = value
+    elif value is None:
+        return ""
+    else:
+        text = str(value)
+    return text if len(text) <= max_len else text[: max_len - 3] + "..."
+
+
+def _as_str(value: Any) -> str | None:
+    return value if type(value) is str else None
 
 
+def _as_dict(value: Any) -> Dict[str, Any] | None:
+    return value if type(value) is dict else None
+
+
+_quote_query = partial(quote, safe=QUERY_SAFE_CHARS)
+
+_WORD_RE = re.compile(r"\w+")
+_TOKEN_RE = re.compile(r"[A-Za-z0-9]+")
+_BOOLEAN_OPERATOR_RE = re.compile(r"\bAND\b|\bOR\b", re.IGNORECASE)
+
+# Queries made only of these characters need nothing but %20 for spaces.
+_QUERY_NEEDS_QUOTING = re.compile(r'[^A-Za-z0-9 _.~"()\[\]{}:*?+\-/\\]')
+
+
+@lru_cache(maxsize=256)
 def _build_url(base_url: str, query: str) -> str:
-    encoded = quote(query, safe='"()[]{}:*?+-/\\')
-    return f"{base_url}?query={encoded}"
+    if not _QUERY_NEEDS_QUOTING.search(query):
+        return f"{base_url}?query={query.replace(' ', '%20')}"
+    return f"{base_url}?query={_quote_query(query)}"
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=40, max_keepalive_connections=20),
+        )
+    return _http_client
+
+
+async def _get_json(url: str, params: Dict[str, Any] | None, timeout: float) -> Any:
+    response = await _get_http_client().get(url, params=params, timeout=timeout)
+    response.raise_for_status()
+    return _json_loads(response.content)
+
+
+async def _fetch_json(
+    url: str, params: Dict[str, Any] | None = None, timeout: float = 30.0
+) -> Any:
+    # Identical requests issued while one is in flight share its response.
+    # httpx.URL(url, params=...) replaces the query string, so merge instead.
+    key = str(httpx.URL(url).copy_merge_params(params)) if params else url
+    pending = _inflight_requests.get(key)
+    if pending is None:
+        pending = asyncio.ensure_future(_get_json(url, params, timeout))
+        _inflight_requests[key] = pending
+        pending.add_done_callback(lambda _: _inflight_requests.pop(key, None))
+    return await asyncio.shield(pending)
+
+
+def _search_cache_get(key: Tuple[Any, ...]) -> Dict[str, Any] | None:
+    entry = _search_cache.get(key)
+    if entry is None:
+        return None
+    stored_at, payload = entry
+    if time.monotonic() - stored_at > SEARCH_CACHE_TTL_SECONDS:
+        del _search_cache[key]
+        return None
+    _search_cache.move_to_end(key)
+    return copy.deepcopy(payload)
+
+
+def _search_cache_put(key: Tuple[Any, ...], payload: Dict[str, Any]) -> None:
+    _search_cache[key] = (time.monotonic(), copy.deepcopy(payload))
+    _search_cache.move_to_end(key)
+    while len(_search_cache) > SEARCH_CACHE_MAX_ENTRIES:
+        _search_cache.popitem(last=False)
+
+
+def _finish_search(
+    key: Tuple[Any, ...], future: "asyncio.Future[Dict[str, Any]]"
+) -> None:
+    _inflight_searches.pop(key, None)
+    if not future.cancelled() and future.exception() is None:
+        _search_cache_put(key, future.result())
+
+
+def _cached_search(
+    func: Callable[..., Awaitable[Dict[str, Any]]],
+) -> Callable[..., Awaitable[Dict[str, Any]]]:
+    # Keyed on the bound arguments so positional and keyword calls share entries.
+    signature = inspect.signature(func)
+
+    @wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = (func.__name__, *bound.arguments.values())
+        cached = _search_cache_get(key)
+        if cached is not None:
+            return cached
+        # Concurrent identical searches wait on the first one instead of
+        # repeating its fallback and enrichment queries.
+        pending = _inflight_searches.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(func(*args, **kwargs))
+            _inflight_searches[key] = pending
+            pending.add_done_callback(partial(_finish_search, key))
+        return copy.deepcopy(await asyncio.shield(pending))
+
+    return wrapper
 
 
 def _query_terms(query: str) -> List[str]:
     terms: List[str] = []
-    for token in re.findall(r"[A-Za-z0-9]+", query.lower()):
+    seen: set[str] = set()
+    for token in _TOKEN_RE.findall(query.lower()):
         if len(token) < 3:
             continue
-        if token in STOPWORDS:
+        if token in STOPWORDS or token in seen:
             continue
-        if token not in terms:
-            terms.append(token)
+        seen.add(token)
+        terms.append(token)
     return terms
 
 
-def _dataset_relevance_score(item: Dict[str, Any], query_terms: List[str]) -> float:
-    title = item.get("title") if isinstance(item.get("title"), str) else ""
-    description = (
-        item.get("description") if isinstance(item.get("description"), str) else ""
-    )
-    accession = item.get("accession") if isinstance(item.get("accession"), str) else ""
+@lru_cache(maxsize=1024)
+def _lowered_words(text: str) -> Tuple[str, frozenset[str]]:
+    # A term is a whole-word match exactly when it is one of the \w+ runs.
+    lowered = text.lower()
+    return lowered, frozenset(_WORD_RE.findall(lowered))
+
 
-    title_lower = title.lower()
-    description_lower = description.lower()
+def _dataset_relevance_score(
+    item: Dict[str, Any], query_terms: List[str], stop_at: float | None = None
+) -> float:
+    title = _as_str(item.get("title")) or ""
+    description = _as_str(item.get("description")) or ""
+    accession = _as_str(item.get("accession")) or ""
+
+    title_lower, title_words = _lowered_words(title)
+    description_lower, description_words = _lowered_words(description)
     accession_lower = accession.lower()
 
+    api_score = item.get("score")
+    api_bonus = (
+        min(float(api_score), 20.0) / 20.0
+        if isinstance(api_score, (int, float))
+        else 0.0
+    )
+
     score = 0.0
     term_hits = 0
     for term in query_terms:
-        term_re = re.compile(rf"\\b{re.escape(term)}\\b", re.IGNORECASE)
-        in_title = bool(term_re.search(title_lower))
-        in_desc = bool(term_re.search(description_lower))
+        in_title = term in title_words
+        in_desc = term in description_words
         if in_title:
             score += 6.0
             term_hits += 1
@@ -111,35 +282,37 @@ def _dataset_relevance_score(item: Dict[str, Any], query_terms: List[str]) -> fl
         if term in accession_lower:
             score += 0.5
 
+        # Term scores only grow, so threshold checks can stop once it is met.
+        if stop_at is not None and score + api_bonus >= stop_at:
+            return score + api_bonus
+
     if query_terms and term_hits >= max(2, len(query_terms)):
         score += 2.0
 
-    api_score = item.get("score")
-    if isinstance(api_score, (int, float)):
-        score += min(float(api_score), 20.0) / 20.0
-
-    return score
+    return score + api_bonus
 
 
 def _rerank_dataset_results(
-    items: List[Dict[str, Any]], query: str
+    items: List[Dict[str, Any]], query: str, terms: List[str] | None = None
 ) -> List[Dict[str, Any]]:
-    terms = _query_terms(query)
+    if terms is None:
+        terms = _query_terms(query)
     if not terms:
         return items
-    ranked: List[tuple[float, Dict[str, Any]]] = []
-    for item in items:
-        ranked.append((_dataset_relevance_score(item, terms), item))
-    ranked.sort(key=lambda pair: pair[0], reverse=True)
-    return [item for _, item in ranked]
+    return sorted(
+        items, key=lambda item: _dataset_relevance_score(item, terms), reverse=True
+    )
 
 
-def _has_strong_match(items: List[Dict[str, Any]], query: str) -> bool:
-    terms = _query_terms(query)
+def _has_strong_match(
+    items: List[Dict[str, Any]], query: str, terms: List[str] | None = None
+) -> bool:
+    if terms is None:
+        terms = _query_terms(query)
     if not terms:
         return True
     for item in items:
-        if _dataset_relevance_score(item, terms) >= 6.0:
+        if _dataset_relevance_score(item, terms, stop_at=6.0) >= 6.0:
             return True
     return False
 
@@ -149,22 +322,15 @@ def _merge_unique_dataset_results(
     secondary: List[Dict[str, Any]],
 ) -> List[Dict[str, Any]]:
     merged: List[Dict[str, Any]] = []
-    seen: set[str] = set()
-
-    def _result_key(entry: Dict[str, Any]) -> str:
-        accession = entry.get("accession")
-        if isinstance(accession, str) and accession.strip():
-            return f"acc:{accession.strip().lower()}"
-        url = entry.get("url")
-        if isinstance(url, str) and url.strip():
-            return f"url:{url.strip().lower()}"
-        title = entry.get("title")
-        if isinstance(title, str) and title.strip():
-            return f"title:{title.strip().lower()}"
-        return f"obj:{id(entry)}"
-
-    for candidate in [*primary, *secondary]:
-        key = _result_key(candidate)
+    seen: set[Tuple[str, Any]] = set()
+
+    for candidate in chain(primary, secondary):
+        key: Tuple[str, Any] = ("obj", id(candidate))
+        for field in ("accession", "url", "title"):
+            value = _as_str(candidate.get(field))
+            if value and value.strip():
+                key = (field, value.strip().lower())
+                break
         if key in seen:
             continue
         seen.add(key)
@@ -187,12 +353,8 @@ def _extract_hits_and_total(
         hits_list = hits_value.get("hits", [])
         if not isinstance(hits_list, list):
             hits_list = []
-        total_obj = (
-            hits_value.get("total", {})
-            if isinstance(hits_value.get("total"), dict)
-            else {}
-        )
-        total = total_obj.get("value") if isinstance(total_obj, dict) else None
+        total_obj = _as_dict(hits_value.get("total")) or _EMPTY_DICT
+        total = total_obj.get("value")
         if not isinstance(total, int):
             total = len(hits_list)
         return hits_list, total
@@ -200,12 +362,27 @@ def _extract_hits_and_total(
     return [], 0
 
 
-def _first_nonempty_string(values: List[Any]) -> str | None:
+def _map_hits(
+    payload: Dict[str, Any] | Any,
+    mapper: Callable[[Dict[str, Any]], Dict[str, Any]],
+    limit: int,
+) -> tuple[List[Dict[str, Any]], int]:
+    hits, total = _extract_hits_and_total(payload)
+    mapped = [
+        mapper(item) for item in islice(hits, max(1, limit)) if isinstance(item, dict)
+    ]
+    return mapped, total
+
+
+def _first_nonempty_string(*values: Any) -> str | None:
     for value in values:
-        if isinstance(value, str):
-            cleaned = value.strip()
-            if cleaned:
-                return cleaned
+        if type(value) is not str or not value:
+            continue
+        if not value[0].isspace() and not value[-1].isspace():
+            return value
+        cleaned = value.strip()
+        if cleaned:
+            return cleaned
     return None
 
 
@@ -226,37 +403,32 @@ def _metadata_value(
     return None
 
 
+def _hit_score(item: Dict[str, Any]) -> float | None:
+    score = item.get("_score")
+    return score if isinstance(score, (int, float)) else None
+
+
 def _dataset_result_from_hit(item: Dict[str, Any]) -> Dict[str, Any]:
-    source_payload = (
-        item.get("_source") if isinstance(item.get("_source"), dict) else item
-    )
+    source_payload = _as_dict(item.get("_source")) or item
 
     accession = _first_nonempty_string(
-        [
-            source_payload.get("accession_id"),
-            source_payload.get("accession"),
-            source_payload.get("id"),
-            item.get("_id"),
-        ]
+        source_payload.get("accession_id"),
+        source_payload.get("accession"),
+        source_payload.get("id"),
+        item.get("_id"),
     )
     title = (
         _first_nonempty_string(
-            [
-                source_payload.get("title"),
-                source_payload.get("name"),
-                source_payload.get("dataset"),
-                accession,
-                source_payload.get("uuid"),
-                item.get("_id"),
-            ]
+            source_payload.get("title"),
+            source_payload.get("name"),
+            source_payload.get("dataset"),
+            accession,
+            source_payload.get("uuid"),
+            item.get("_id"),
         )
         or "Untitled"
     )
-    description_value = (
-        source_payload.get("description")
-        if isinstance(source_payload.get("description"), str)
-        else None
-    )
+    description_value = _as_str(source_payload.get("description"))
 
     # example_image_uri is no longer populated by BIA; fall back to zarr URL
     thumbnail_url = None
@@ -282,156 +454,103 @@ def _dataset_result_from_hit(item: Dict[str, Any]) -> Dict[str, Any]:
     return {
         "title": _short_text(title, DATASET_TITLE_MAX_LEN),
         "accession": accession or "",
-        "url": (
-            f"https://beta.bioimagearchive.org/bioimage-archive/study/{accession}"
-            if accession
-            else None
-        ),
+        "url": STUDY_URL_PREFIX + accession if accession else None,
         "description": (
             _short_text(description_value, DATASET_DESCRIPTION_MAX_LEN)
-            if isinstance(description_value, str)
-            else None
-        ),
-        "doi": (
-            source_payload.get("doi")
-            if isinstance(source_payload.get("doi"), str)
+            if description_value is not None
             else None
         ),
-        "release_date": (
-            source_payload.get("release_date")
-            if isinstance(source_payload.get("release_date"), str)
-            else None
-        ),
-        "thumbnail_url": thumbnail_url,
-        "score": item.get("_score"),
+        "doi": _as_str(source_payload.get("doi")),
+        "release_date": _as_str(source_payload.get("release_date")),
+        "thumbnail_url": _as_str(thumbnail_url),
+        "score": _hit_score(item),
     }
 
 
+def _project_str_fields(
+    item: Dict[str, Any],
+    schema: Tuple[Tuple[str, str | None, int | None], ...],
+    out: Dict[str, Any],
+) -> Dict[str, Any]:
+    for key, default, max_len in schema:
+        value = item.get(key)
+        if type(value) is not str:
+            out[key] = default
+        elif max_len is None:
+            out[key] = value
+        else:
+            out[key] = _short_text(value, max_len)
+    return out
+
+
 def _compact_dataset_result(item: Dict[str, Any]) -> Dict[str, Any]:
-    score_value = item.get("score")
-    score = score_value if isinstance(score_value, (int, float)) else None
     compact: Dict[str, Any] = {
-        "title": _short_text(item.get("title", "Untitled"), DATASET_TITLE_MAX_LEN),
-        "accession": (
-            item.get("accession") if isinstance(item.get("accession"), str) else ""
-        ),
-        "url": item.get("url") if isinstance(item.get("url"), str) else None,
-        "description": (
-            _short_text(item.get("description"), DATASET_DESCRIPTION_MAX_LEN)
-            if isinstance(item.get("description"), str)
-            else None
-        ),
-        "doi": item.get("doi") if isinstance(item.get("doi"), str) else None,
-        "release_date": (
-            item.get("release_date")
-            if isinstance(item.get("release_date"), str)
-            else None
-        ),
-        "thumbnail_url": (
-            item.get("thumbnail_url")
-            if isinstance(item.get("thumbnail_url"), str)
-            else None
-        ),
-        "score": score,
+        "title": _short_text(item.get("title", "Untitled"), DATASET_TITLE_MAX_LEN)
     }
+    _project_str_fields(item, _DATASET_COMPACT_SCHEMA, compact)
+    score = item.get("score")
+    compact["score"] = score if isinstance(score, (int, float)) else None
     return compact
 
 
 def _image_result_from_hit(item: Dict[str, Any]) -> Dict[str, Any]:
-    source_payload = (
-        item.get("_source") if isinstance(item.get("_source"), dict) else item
-    )
+    source_payload = _as_dict(item.get("_source")) or item
     file_pattern_payload = _metadata_value(source_payload, "file_pattern")
     file_pattern = (
-        file_pattern_payload.get("file_pattern")
-        if isinstance(file_pattern_payload, dict)
+        _as_str(file_pattern_payload.get("file_pattern"))
+        if file_pattern_payload is not None
         else None
     )
 
-    creation_process = (
-        source_payload.get("creation_process")
-        if isinstance(source_payload.get("creation_process"), dict)
-        else {}
-    )
-    acquisition_process = (
-        creation_process.get("acquisition_process")
-        if isinstance(creation_process.get("acquisition_process"), list)
-        else []
-    )
+    creation_process = _as_dict(source_payload.get("creation_process")) or _EMPTY_DICT
+    acquisition_process = creation_process.get("acquisition_process")
     first_acquisition = (
-        acquisition_process[0]
-        if acquisition_process and isinstance(acquisition_process[0], dict)
-        else {}
-    )
-    acquisition_title = (
-        first_acquisition.get("title")
-        if isinstance(first_acquisition.get("title"), str)
+        _as_dict(acquisition_process[0])
+        if type(acquisition_process) is list and acquisition_process
         else None
-    )
+    ) or _EMPTY_DICT
+    acquisition_title = _as_str(first_acquisition.get("title"))
 
     accession = _first_nonempty_string(
-        [
-            source_payload.get("accession_id"),
-            source_payload.get("accession"),
-            source_payload.get("study_accession"),
-        ]
-    )
-    image_id = (
-        _first_nonempty_string([source_payload.get("uuid"), item.get("_id")]) or ""
+        source_payload.get("accession_id"),
+        source_payload.get("accession"),
+        source_payload.get("study_accession"),
     )
+    image_id = _first_nonempty_string(source_payload.get("uuid"), item.get("_id")) or ""
     title = (
         _first_nonempty_string(
-            [
-                source_payload.get("title"),
-                source_payload.get("name"),
-                source_payload.get("label"),
-                file_pattern if isinstance(file_pattern, str) else None,
-                acquisition_title,
-                image_id,
-            ]
+            source_payload.get("title"),
+            source_payload.get("name"),
+            source_payload.get("label"),
+            file_pattern,
+            acquisition_title,
+            image_id,
         )
         or "Untitled"
     )
 
     return {
+        "title": _short_text(title, IMAGE_TITLE_MAX_LEN),
         "id": image_id,
         "accession": accession or "",
-        "title": title,
-        "study_url": (
-            f"https://beta.bioimagearchive.org/bioimage-archive/study/{accession}"
-            if accession
-            else None
-        ),
-        "dataset_uuid": (
-            source_payload.get("submission_dataset_uuid")
-            if isinstance(source_payload.get("submission_dataset_uuid"), str)
+        "study_url": STUDY_URL_PREFIX + accession if accession else None,
+        "file_pattern": (
+            _short_text(file_pattern, IMAGE_FILE_PATTERN_MAX_LEN)
+            if file_pattern is not None
             else None
         ),
-        "file_pattern": file_pattern if isinstance(file_pattern, str) else None,
-        "acquisition_title": acquisition_title,
-        "score": item.get("_score"),
+        "score": _hit_score(item),
     }
 
 
 def _compact_image_result(item: Dict[str, Any]) -> Dict[str, Any]:
-    score_value = item.get("score")
-    score = score_value if isinstance(score_value, (int, float)) else None
-    return {
-        "title": _short_text(item.get("title", "Untitled"), IMAGE_TITLE_MAX_LEN),
-        "id": item.get("id") if isinstance(item.get("id"), str) else "",
-        "accession": (
-            item.get("accession") if isinstance(item.get("accession"), str) else ""
-        ),
-        "study_url": (
-            item.get("study_url") if isinstance(item.get("study_url"), str) else None
-        ),
-        "file_pattern": (
-            _short_text(item.get("file_pattern"), IMAGE_FILE_PATTERN_MAX_LEN)
-            if isinstance(item.get("file_pattern"), str)
-            else None
-        ),
-        "score": score,
+    compact: Dict[str, Any] = {
+        "title": _short_text(item.get("title", "Untitled"), IMAGE_TITLE_MAX_LEN)
     }
+    _project_str_fields(item, _IMAGE_COMPACT_SCHEMA, compact)
+    score = item.get("score")
+    compact["score"] = score if isinstance(score, (int, float)) else None
+    return compact
 
 
 def _format_dataset_assistant_summary(
@@ -447,26 +566,19 @@ def _format_dataset_assistant_summary(
         )
 
     lines = [f"Here are up to {max_items} BioImage Archive dataset matches:"]
-    for idx, entry in enumerate(result_list[:max_items], start=1):
+    for idx, entry in enumerate(islice(result_list, max_items), start=1):
         if not isinstance(entry, dict):
             continue
-        title = (
-            entry.get("title") if isinstance(entry.get("title"), str) else "Untitled"
-        )
-        accession = (
-            entry.get("accession") if isinstance(entry.get("accession"), str) else ""
-        )
-        url = entry.get("url") if isinstance(entry.get("url"), str) else None
+        title = entry.get("title")
+        if type(title) is not str:
+            title = "Untitled"
+        accession = _as_str(entry.get("accession"))
+        url = _as_str(entry.get("url"))
         score = entry.get("score")
+        accession_part = f" [{accession}]" if accession else ""
+        url_part = f" - {url}" if url else ""
         score_part = f" (score {score:.2f})" if isinstance(score, (int, float)) else ""
-        if accession and url:
-            lines.append(f"{idx}. {title} [{accession}] - {url}{score_part}")
-        elif accession:
-            lines.append(f"{idx}. {title} [{accession}]{score_part}")
-        elif url:
-            lines.append(f"{idx}. {title} - {url}{score_part}")
-        else:
-            lines.append(f"{idx}. {title}{score_part}")
+        lines.append(f"{idx}. {title}{accession_part}{url_part}{score_part}")
 
     total = payload.get("total")
     if isinstance(total, int):
@@ -483,6 +595,7 @@ def _normalize_search_payload(
     query: str,
     limit: int,
     payload: Dict[str, Any],
+    precompacted: bool = False,
 ) -> Dict[str, Any]:
     safe_limit = max(1, int(limit))
     result_limit = min(max(1, safe_limit), 8)
@@ -490,17 +603,17 @@ def _normalize_search_payload(
     raw_results = payload.get("results")
     result_items = raw_results if isinstance(raw_results, list) else []
 
-    compact_results: List[Dict[str, Any]] = []
     ranked_items = result_items
     if kind == "datasets":
         ranked_items = _rerank_dataset_results(result_items, query)
-    for entry in ranked_items[:result_limit]:
-        if not isinstance(entry, dict):
-            continue
-        if kind == "datasets":
-            compact_results.append(_compact_dataset_result(entry))
-        else:
-            compact_results.append(_compact_image_result(entry))
+    compact_results: List[Dict[str, Any]] = [
+        entry for entry in islice(ranked_items, result_limit) if isinstance(entry, dict)
+    ]
+    if not precompacted:
+        compact = (
+            _compact_dataset_result if kind == "datasets" else _compact_image_result
+        )
+        compact_results = [compact(entry) for entry in compact_results]
 
     total_value = payload.get("total")
     total = total_value if isinstance(total_value, int) else len(compact_results)
@@ -509,8 +622,7 @@ def _normalize_search_payload(
     if isinstance(payload_url, str) and payload_url.strip():
         url = payload_url
     else:
-        base_url = BASE_SEARCH_URL if kind == "datasets" else BASE_IMAGE_SEARCH_URL
-        url = _build_url(base_url, query)
+        url = _build_url(BASE_URL_BY_KIND[kind], query)
 
     normalized: Dict[str, Any] = {
         "query": query,
@@ -536,9 +648,12 @@ async def _search_via_proxy(kind: str, query: str, limit: int) -> Dict[str, Any]
     try:
         result = await bridge(kind, query, int(limit))
         if hasattr(result, "to_py"):
+            # The bridge returns a plain JS object; to_py() already deep-converts.
             result = result.to_py()
+            if isinstance(result, dict):
+                return result
         if isinstance(result, str):
-            parsed = json.loads(result)
+            parsed = _json_loads(result)
             if isinstance(parsed, dict):
                 return parsed
             return {"error": "Proxy returned non-dict response"}
@@ -551,26 +666,23 @@ async def _search_via_proxy(kind: str, query: str, limit: int) -> Dict[str, Any]
 
 def _fallback_terms_from_query(query: str) -> List[str]:
     terms: List[str] = []
-    for part in re.split(r"\bAND\b|\bOR\b", query, flags=re.IGNORECASE):
+    seen: set[str] = set()
+    for part in _BOOLEAN_OPERATOR_RE.split(query):
         candidate = part.strip().strip("\"'()[]{}")
         if len(candidate) < 2:
             continue
-        if candidate.lower() in {"and", "or", "not"}:
+        if candidate.lower() in {"and", "or", "not"} or candidate in seen:
             continue
-        if candidate not in terms:
-            terms.append(candidate)
+        seen.add(candidate)
+        terms.append(candidate)
     return terms
 
 
-def _fallback_candidate_terms(query: str) -> List[str]:
-    candidates: List[str] = []
-    for term in _fallback_terms_from_query(query):
-        if term not in candidates:
-            candidates.append(term)
-    for term in _query_terms(query):
-        if term not in candidates:
-            candidates.append(term)
-    return candidates
+def _fallback_candidate_terms(query: str, terms: List[str] | None = None) -> List[str]:
+    if terms is None:
+        terms = _query_terms(query)
+    # dict.fromkeys keeps first-seen order while dropping duplicates.
+    return list(dict.fromkeys(chain(_fallback_terms_from_query(query), terms)))
 
 
 async def _search_datasets_once(query: str, safe_limit: int) -> Dict[str, Any]:
@@ -582,17 +694,9 @@ async def _search_datasets_once(query: str, safe_limit: int) -> Dict[str, Any]:
         return _normalize_search_payload("datasets", query, safe_limit, proxied)
 
     url = _build_url(BASE_SEARCH_URL, query)
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.get(url)
-        response.raise_for_status()
-        payload = response.json()
+    payload = await _fetch_json(url)
 
-    hits, total = _extract_hits_and_total(payload)
-    top_hits: List[Dict[str, Any]] = []
-
-    for item in hits[:fetch_limit]:
-        if isinstance(item, dict):
-            top_hits.append(_dataset_result_from_hit(item))
+    top_hits, total = _map_hits(payload, _dataset_result_from_hit, fetch_limit)
 
     raw_payload = {
         "query": query,
@@ -600,9 +704,12 @@ async def _search_datasets_once(query: str, safe_limit: int) -> Dict[str, Any]:
         "total": total,
         "results": top_hits,
     }
-    return _normalize_search_payload("datasets", query, safe_limit, raw_payload)
+    return _normalize_search_payload(
+        "datasets", query, safe_limit, raw_payload, precompacted=True
+    )
 
 
+@_cached_search
 async def search_datasets(query: str, limit: int = 10) -> Dict[str, Any]:
     """
     Search BioImage Archive datasets by full-text query.
@@ -617,6 +724,7 @@ async def search_datasets(query: str, limit: int = 10) -> Dict[str, Any]:
     safe_limit = max(1, int(limit))
     print(f"DEBUG: search_datasets primary query='{query}' limit={safe_limit}")
     primary_result = await _search_datasets_once(query, safe_limit)
+    query_terms = _query_terms(query)
     if (
         isinstance(primary_result.get("total"), int)
         and primary_result.get("total", 0) > 0
@@ -626,12 +734,27 @@ async def search_datasets(query: str, limit: int = 10) -> Dict[str, Any]:
         print(
             f"DEBUG: search_datasets primary query returned total={primary_result.get('total', 0)}"
         )
-        if not _has_strong_match(primary_list, query) and len(_query_terms(query)) >= 2:
-            for term in _fallback_candidate_terms(query)[:4]:
+        if (
+            not _has_strong_match(primary_list, query, query_terms)
+            and len(query_terms) >= 2
+        ):
+            enrichment_terms = _fallback_candidate_terms(query, query_terms)[:4]
+            for term in enrichment_terms:
                 print(
                     f"DEBUG: search_datasets enrichment query='{term}' after weak relevance in primary query='{query}'"
                 )
-                enrichment_result = await _search_datasets_once(term, safe_limit)
+            # Fetch every term at once, then keep the first strong merge in
+            # term order, as the sequential loop did.
+            enrichment_results = await asyncio.gather(
+                *(_search_datasets_once(term, safe_limit) for term in enrichment_terms),
+                return_exceptions=True,
+            )
+            for term, enrichment_result in zip(enrichment_terms, enrichment_results):
+                if isinstance(enrichment_result, BaseException):
+                    print(
+                        f"DEBUG: search_datasets enrichment query='{term}' failed: {enrichment_result}"
+                    )
+                    continue
                 enrichment_items = enrichment_result.get("results")
                 enrichment_list = (
                     enrichment_items if isinstance(enrichment_items, list) else []
@@ -639,22 +762,36 @@ async def search_datasets(query: str, limit: int = 10) -> Dict[str, Any]:
                 merged_results = _merge_unique_dataset_results(
                     primary_list, enrichment_list
                 )
-                reranked = _rerank_dataset_results(merged_results, query)
+                reranked = _rerank_dataset_results(merged_results, query, query_terms)
                 primary_result["results"] = reranked[: min(8, safe_limit)]
-                if _has_strong_match(primary_result["results"], query):
+                if _has_strong_match(primary_result["results"], query, query_terms):
                     primary_result["enriched_with_query"] = term
                     break
         return primary_result
 
-    fallback_candidates = _fallback_candidate_terms(query)
+    fallback_candidates = _fallback_candidate_terms(query, query_terms)
     if len(fallback_candidates) >= 1:
         merged_results: List[Dict[str, Any]] = []
         fallback_terms_used: List[str] = []
-        for term in fallback_candidates[:4]:
+        fallback_terms = fallback_candidates[:4]
+        for term in fallback_terms:
             print(
                 f"DEBUG: search_datasets fallback query='{term}' after empty primary query='{query}'"
             )
-            fallback_result = await _search_datasets_once(term, safe_limit)
+        # A flaky term must not discard the other terms' results.
+        fallback_results = await asyncio.gather(
+            *(_search_datasets_once(term, safe_limit) for term in fallback_terms),
+            return_exceptions=True,
+        )
+        failures = [r for r in fallback_results if isinstance(r, BaseException)]
+        if len(failures) == len(fallback_results):
+            raise failures[0]
+        for term, fallback_result in zip(fallback_terms, fallback_results):
+            if isinstance(fallback_result, BaseException):
+                print(
+                    f"DEBUG: search_datasets fallback query='{term}' failed: {fallback_result}"
+                )
+                continue
             fallback_items = fallback_result.get("results")
             fallback_list = fallback_items if isinstance(fallback_items, list) else []
             if fallback_list:
@@ -667,7 +804,7 @@ async def search_datasets(query: str, limit: int = 10) -> Dict[str, Any]:
                 )
 
         if merged_results:
-            reranked = _rerank_dataset_results(merged_results, query)
+            reranked = _rerank_dataset_results(merged_results, query, query_terms)
             aggregated: Dict[str, Any] = {
                 "query": query,
                 "url": _build_url(BASE_SEARCH_URL, query),
@@ -682,6 +819,7 @@ async def search_datasets(query: str, limit: int = 10) -> Dict[str, Any]:
     return primary_result
 
 
+@_cached_search
 async def search_images(
     query: str,
     limit: int = 10,
@@ -709,7 +847,7 @@ async def search_images(
             raise RuntimeError(proxied["error"])
         return _normalize_search_payload("images", query, safe_limit, proxied)
 
-    params: Dict[str, Any] = {"query": quote(query, safe='"()[]{}:*?+-/\\')}
+    params: Dict[str, Any] = {"query": _quote_query(query)}
     if scientific_name:
         params["scientific_name"] = scientific_name
     if imaging_method:
@@ -717,12 +855,9 @@ async def search_images(
     param_str = "&".join(f"{k}={quote(str(v), safe='')}" for k, v in params.items())
     url = f"{BASE_IMAGE_SEARCH_URL}?{param_str}"
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.get(url)
-        response.raise_for_status()
-        payload = response.json()
+    payload = await _fetch_json(url)
 
-    hits, total = _extract_hits_and_total(payload)
+    top_hits, total = _map_hits(payload, _image_result_from_hit, safe_limit)
 
     # Extract available facet values to help with follow-up queries
     facets = payload.get("facets", {})
@@ -733,11 +868,6 @@ async def search_images(
         b["key"] for b in facets.get("imaging_method", {}).get("buckets", [])[:10]
     ]
 
-    top_hits: List[Dict[str, Any]] = []
-    for item in hits[: max(1, safe_limit)]:
-        if isinstance(item, dict):
-            top_hits.append(_image_result_from_hit(item))
-
     raw_payload = {
         "query": query,
         "url": url,
@@ -746,7 +876,9 @@ async def search_images(
         "available_organisms": available_organisms,
         "available_imaging_methods": available_methods,
     }
-    return _normalize_search_payload("images", query, safe_limit, raw_payload)
+    return _normalize_search_payload(
+        "images", query, safe_limit, raw_payload, precompacted=True
+    )
 
 
 async def search_models(task: str, limit: int = 5) -> Dict[str, Any]:
@@ -761,11 +893,8 @@ async def search_models(task: str, limit: int = 5) -> Dict[str, Any]:
         Dictionary with 'results' (list of id, name, tags, description) and 'total' count.
     """
     url = "https://hypha.aicell.io/ri-scale/artifacts/ai-model-hub/children"
-    async with httpx.AsyncClient(timeout=15.0) as client:
-        r = await client.get(url, params={"limit": 100})
-        r.raise_for_status()
-        data = r.json()
-        items = data.get("items", data) if isinstance(data, dict) else data
+    data = await _fetch_json(url, params={"limit": 100}, timeout=15.0)
+    items = data.get("items", data) if isinstance(data, dict) else data
 
     keywords = [w.lower() for w in task.split() if len(w) > 2]
     matches = []
@@ -785,43 +914,90 @@ async def search_models(task: str, limit: int = 5) -> Dict[str, Any]:
     return {"results": matches[:limit], "total": len(matches)}
 
 
-async def run_cellpose_on_image(image_url: str) -> str:
-    """
-    Run Cellpose-SAM cell segmentation on an image from a URL and return
-    a segmentation overlay rendered as an inline Markdown image.
+async def _get_service_with_retry(service_id: str) -> Any:
+    for attempt in range(HYPHA_SERVICE_ATTEMPTS):
+        try:
+            return await asyncio.wait_for(
+                _hypha_server.get_service(service_id),
+                timeout=HYPHA_SERVICE_TIMEOUT_SECONDS,
+            )
+        except Exception as exc:
+            if attempt + 1 >= HYPHA_SERVICE_ATTEMPTS:
+                raise
+            print(f"DEBUG: get_service('{service_id}') failed, retrying: {exc}")
+            await asyncio.sleep(0.2 * 2**attempt)
 
-    Args:
-        image_url: Direct URL to an image. Use the thumbnail_url field from
-            search_datasets() or search_images() results.
 
-    Returns:
-        Markdown string with cell count and an inline base64 segmentation overlay image.
-    """
+class _HyphaRPCError(RuntimeError):
+    """A Hypha connection or remote call failed (not a bad user input)."""
+
+
+async def _rpc(awaitable: Any) -> Any:
+    try:
+        return await awaitable
+    except Exception as exc:
+        raise _HyphaRPCError(str(exc) or type(exc).__name__) from exc
+
+
+async def _get_hypha_services(*service_ids: str) -> List[Any]:
+    global _hypha_server
+    # Concurrent first calls must share one connection, not open one each.
+    async with _hypha_lock:
+        if _hypha_server is None:
+            from hypha_rpc import connect_to_server
+
+            _hypha_server = await _rpc(
+                connect_to_server({"server_url": HYPHA_SERVER_URL})
+            )
+        missing = [sid for sid in service_ids if sid not in _hypha_services]
+        if missing:
+            resolved = await _rpc(
+                asyncio.gather(*(_get_service_with_retry(sid) for sid in missing))
+            )
+            _hypha_services.update(zip(missing, resolved))
+        return [_hypha_services[sid] for sid in service_ids]
+
+
+async def _reset_hypha_services() -> None:
+    global _hypha_server
+    async with _hypha_lock:
+        server, _hypha_server = _hypha_server, None
+        _hypha_services.clear()
+    if server is not None:
+        try:
+            await asyncio.wait_for(
+                server.disconnect(), timeout=HYPHA_SERVICE_TIMEOUT_SECONDS
+            )
+        except Exception as exc:
+            print(f"DEBUG: Hypha disconnect failed: {exc}")
+
+
+async def _run_cellpose_on_image(image_url: str) -> str:
     import io
     import base64
     import numpy as np
     from PIL import Image
-    from hypha_rpc import connect_to_server
 
-    # 1. Connect to Hypha and get chat proxy (all external requests go through it — CORS)
-    server = await connect_to_server({"server_url": "https://hypha.aicell.io"})
-    proxy = await server.get_service("ri-scale/default@chat-proxy")
+    # 1. Get the chat proxy (all external requests go through it — CORS) and
+    #    the Cellpose service; handles are reused across calls.
+    proxy, cellpose = await _get_hypha_services(
+        "ri-scale/default@chat-proxy", "ri-scale/cellpose-finetuning"
+    )
 
     async def _proxy_get_json(url):
-        import json as _json
-        r = await proxy.resolve_url(url=url)
+        r = await _rpc(proxy.resolve_url(url=url))
         if not r.get("ok"):
             raise RuntimeError(f"Proxy fetch failed for {url}: {r.get('error')}")
         if r.get("json"):
             return r["json"]
         if r.get("text"):
-            return _json.loads(r["text"])
+            return _json_loads(r["text"])
         if r.get("base64"):
-            return _json.loads(base64.b64decode(r["base64"]).decode())
+            return _json_loads(base64.b64decode(r["base64"]))
         raise RuntimeError(f"Empty proxy response for {url}")
 
     async def _proxy_get_bytes(url):
-        r = await proxy.resolve_url(url=url)
+        r = await _rpc(proxy.resolve_url(url=url))
         if not r.get("ok"):
             raise RuntimeError(f"Proxy fetch failed for {url}: {r.get('error')}")
         return base64.b64decode(r["base64"])
@@ -862,7 +1038,7 @@ async def run_cellpose_on_image(image_url: str) -> str:
             _hwc = ((_hwc - _mn) / max(_mx - _mn, 1) * 255).astype(np.uint8)
         img = Image.fromarray(_hwc.astype(np.uint8))
     else:
-        fetch_result = await proxy.resolve_url(url=image_url)
+        fetch_result = await _rpc(proxy.resolve_url(url=image_url))
         if not fetch_result.get("ok") or not fetch_result.get("base64"):
             raise RuntimeError(f"Could not fetch image via proxy: {fetch_result.get('error', 'unknown error')}")
         img = Image.open(io.BytesIO(base64.b64decode(fetch_result["base64"]))).convert("RGB")
@@ -901,14 +1077,15 @@ async def run_cellpose_on_image(image_url: str) -> str:
     #    output_format="url" makes the service render the overlay with a random
     #    colormap, write full-precision labels (16-bit PNG + npy) to a fresh
     #    Hypha artifact, and return markdown-ready URLs — no base64 round-trip.
-    cellpose = await server.get_service("ri-scale/cellpose-finetuning")
-    result = await cellpose.infer(
-        model="cpsam",
-        input_arrays=[img_chw],
-        output_format="url",
-        niter=250,
-        flow_threshold=0.4,
-        cellprob_threshold=0.0,
+    result = await _rpc(
+        cellpose.infer(
+            model="cpsam",
+            input_arrays=[img_chw],
+            output_format="url",
+            niter=250,
+            flow_threshold=0.4,
+            cellprob_threshold=0.0,
+        )
     )
     payload = result[0]["output"]
 
@@ -932,6 +1109,27 @@ async def run_cellpose_on_image(image_url: str) -> str:
     return str(payload.get("markdown", ""))
 
 
+async def run_cellpose_on_image(image_url: str) -> str:
+    """
+    Run Cellpose-SAM cell segmentation on an image from a URL and return
+    a segmentation overlay rendered as an inline Markdown image.
+
+    Args:
+        image_url: Direct URL to an image. Use the thumbnail_url field from
+            search_datasets() or search_images() results.
+
+    Returns:
+        Markdown string with cell count and an inline base64 segmentation overlay image.
+    """
+    try:
+        return await _run_cellpose_on_image(image_url)
+    except _HyphaRPCError:
+        # Drop cached handles so the next call reconnects and re-resolves;
+        # a bad image_url or undecodable image keeps the connection.
+        await _reset_hypha_services()
+        raise
+
+
 def explain_advanced_query_syntax() -> str:
     """
     Return a concise guide for advanced BioImage Archive query syntax.
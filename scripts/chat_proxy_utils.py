@@ -1,12 +1,11 @@
 import re
 
 MAX_APP_ID_LENGTH = 63
+_SLUG_SEPARATOR_RE = re.compile(r"[^a-z0-9]+")
 
 
 def slugify_branch_name(branch_name: str) -> str:
-    normalized = branch_name.strip().lower().replace("_", "-").replace("/", "-")
-    normalized = re.sub(r"[^a-z0-9-]", "-", normalized)
-    normalized = re.sub(r"-+", "-", normalized).strip("-")
+    normalized = _SLUG_SEPARATOR_RE.sub("-", branch_name.strip().lower()).strip("-")
     return normalized or "branch"
 
 
@@ -1,3 +1,4 @@
+import asyncio
 import os
 import subprocess
 import sys
@@ -23,6 +24,16 @@ def run(cmd: list[str], *, check: bool = True, timeout: int | None = None) -> in
     return completed.returncode
 
 
+def run_health_check(argv: list[str]) -> int:
+    # Run in-process to skip a second interpreter start-up per attempt.
+    import test_chat_proxy
+
+    print("Running health check:", " ".join(argv))
+    return asyncio.run(
+        test_chat_proxy.run_health_check(test_chat_proxy.parse_args(argv))
+    )
+
+
 def get_cli_entrypoint() -> list[str]:
     if Path(HYPHA_APPS_CLI_MAIN).exists():
         return [sys.executable, HYPHA_APPS_CLI_MAIN]
@@ -150,9 +161,7 @@ def main() -> int:
             )
 
     if args.health_check:
-        health_cmd = [
-            sys.executable,
-            str((ROOT / "scripts" / "test_chat_proxy.py").resolve()),
+        health_argv = [
             "--app-id",
             args.app_id,
             "--model",
@@ -161,15 +170,15 @@ def main() -> int:
             str(args.health_timeout),
         ]
         if args.expected_substring:
-            health_cmd.extend(["--expected-substring", args.expected_substring])
+            health_argv.extend(["--expected-substring", args.expected_substring])
         if args.check_request_url:
-            health_cmd.append("--check-request-url")
-            health_cmd.extend(["--request-url", args.request_url])
-            health_cmd.extend(["--request-attempts", str(args.request_attempts)])
+            health_argv.append("--check-request-url")
+            health_argv.extend(["--request-url", args.request_url])
+            health_argv.extend(["--request-attempts", str(args.request_attempts)])
         if args.compare_direct:
-            health_cmd.append("--compare-direct")
+            health_argv.append("--compare-direct")
 
-        first_health_exit = run(health_cmd, check=False)
+        first_health_exit = run_health_check(health_argv)
         if first_health_exit != 0:
             print(
                 f"⚠️ Initial health check failed for {args.app_id}. Trying one explicit start + health retry..."
@@ -179,9 +188,10 @@ def main() -> int:
             except subprocess.TimeoutExpired:
                 print(f"⚠️ Explicit retry start timed out for {args.app_id}.")
 
-            second_health_exit = run(health_cmd, check=False)
+            second_health_exit = run_health_check(health_argv)
             if second_health_exit != 0:
-                raise subprocess.CalledProcessError(second_health_exit, health_cmd)
+                print(f"❌ Health check failed for {args.app_id} after retry.")
+                return second_health_exit
 
     print(
         f"✅ {args.app_id} installed and {'started' if not args.skip_start else 'not started'}"
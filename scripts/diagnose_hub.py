@@ -13,11 +13,11 @@ async def main():
     
     # Check if we can list services to verify connection
     print("Listing services...")
-    services = await server.list_services()
+    services, artifact_manager = await asyncio.gather(
+        server.list_services(), server.get_service("public/artifact-manager")
+    )
     print(f"Found {len(services)} services.")
     
-    artifact_manager = await server.get_service("public/artifact-manager")
-    
     print(f"Reading artifact: {TARGET_ARTIFACT}...")
     try:
         artifact = await artifact_manager.read(TARGET_ARTIFACT)
@@ -1,6 +1,7 @@
 import asyncio
 import json
 import os
+from pathlib import Path
 
 from hypha_rpc import connect_to_server
 
@@ -17,11 +18,13 @@ async def main():
         agent = await am.read(
             artifact_id="hypha-agents/grammatical-deduction-bury-enormously"
         )
-        print(json.dumps(agent["manifest"], indent=2))
+        manifest_json = json.dumps(agent["manifest"], indent=2)
+        print(manifest_json)
 
         # Save to file detailed info for documentation
-        with open("agent_manifest.json", "w") as f:
-            json.dump(agent["manifest"], f, indent=2)
+        await asyncio.to_thread(
+            Path("agent_manifest.json").write_text, manifest_json, encoding="utf-8"
+        )
 
     except Exception as e:
         print(f"Error: {e}")
@@ -15,19 +15,21 @@ async def main():
     am = await api.get_service("public/artifact-manager")
 
     print(f"Checking if artifact {WORKSPACE}/chat-proxy exists...")
-    try:
-        art = await am.read(artifact_id=f"{WORKSPACE}/chat-proxy")
-        print(f"FOUND chat-proxy! ID: {art['id']}")
-        print(f"Files: {art.get('files')}")
-    except Exception as e:
-        print(f"chat-proxy not found: {e}")
-
     # Also check for 'chat-proxy-app' if the ID handling was different
-    try:
-        art = await am.read(artifact_id=f"{WORKSPACE}/chat-proxy-app")
-        print(f"FOUND chat-proxy-app! ID: {art['id']}")
-    except:
-        pass
+    proxy_art, proxy_app_art = await asyncio.gather(
+        am.read(artifact_id=f"{WORKSPACE}/chat-proxy"),
+        am.read(artifact_id=f"{WORKSPACE}/chat-proxy-app"),
+        return_exceptions=True,
+    )
+
+    if isinstance(proxy_art, Exception):
+        print(f"chat-proxy not found: {proxy_art}")
+    else:
+        print(f"FOUND chat-proxy! ID: {proxy_art['id']}")
+        print(f"Files: {proxy_art.get('files')}")
+
+    if not isinstance(proxy_app_art, Exception):
+        print(f"FOUND chat-proxy-app! ID: {proxy_app_art['id']}")
 
 
 if __name__ == "__main__":
@@ -11,12 +11,15 @@ in your browser console, or via the Hypha workspace UI.
 import asyncio
 import os
 
+import httpx
 from hypha_rpc import connect_to_server
 
 SERVER_URL = "https://hypha.aicell.io"
 WORKSPACE = "ri-scale"
 COLLECTION = f"{WORKSPACE}/ai-model-hub"
 TOKEN = os.environ.get("HYPHA_TOKEN")
+MAX_CONCURRENT_SEEDS = 4
+PUT_ATTEMPTS = 3
 
 MODELS = [
     # ── Biomedical / Pathology ──────────────────────────────────────────────
@@ -325,6 +328,67 @@ funded by the European Union under Grant Agreement 101881687.
 """
 
 
+async def put_with_retry(client, url, content, headers):
+    # Presigned PUTs are idempotent; retry transport errors and 5xx with backoff.
+    for attempt in range(PUT_ATTEMPTS):
+        try:
+            resp = await client.put(url, content=content, headers=headers)
+            if resp.status_code < 500 or attempt == PUT_ATTEMPTS - 1:
+                resp.raise_for_status()
+                return
+        except httpx.TransportError:
+            if attempt == PUT_ATTEMPTS - 1:
+                raise
+        await asyncio.sleep(2**attempt)
+
+
+async def seed_model(am, client, model, slots):
+    alias = model["alias"]
+    manifest = model["manifest"]
+
+    # Build README content
+    citations = "\n".join(
+        f"- {c['text']}" + (f" DOI: {c['doi']}" if "doi" in c else f" URL: {c.get('url','')}")
+        for c in manifest.get("cite", [])
+    )
+    readme = README_TEMPLATE.format(
+        name=manifest["name"],
+        description=manifest["description"],
+        type=manifest.get("type", "model"),
+        license=manifest.get("license", "N/A"),
+        version=manifest.get("version", "0.1.0"),
+        framework=manifest.get("framework", "PyTorch"),
+        alias=alias,
+        citations=citations or "See rdf.yaml for references.",
+    )
+
+    async with slots:
+        artifact = await am.create(
+            alias=alias,
+            parent_id=COLLECTION,
+            type="model",
+            manifest=manifest,
+            config={"storage": "git"},
+            stage=True,
+        )
+
+        # Upload README as a file placeholder
+        put_url = await am.put_file(
+            artifact_id=artifact.id,
+            file_path="README.md",
+        )
+        await put_with_retry(
+            client,
+            put_url,
+            content=readme.encode(),
+            headers={"Content-Type": "text/markdown"},
+        )
+
+        # Commit
+        await am.commit(artifact_id=artifact.id)
+    return artifact.id
+
+
 async def main():
     if not TOKEN:
         raise ValueError(
@@ -343,66 +407,29 @@ async def main():
     skipped = []
     failed = []
 
-    for model in MODELS:
-        alias = model["alias"]
-        manifest = model["manifest"]
-        print(f"  Creating: {manifest['name']} ({alias})...", end=" ", flush=True)
-
-        try:
-            # Build README content
-            citations = "\n".join(
-                f"- {c['text']}" + (f" DOI: {c['doi']}" if "doi" in c else f" URL: {c.get('url','')}")
-                for c in manifest.get("cite", [])
-            )
-            readme = README_TEMPLATE.format(
-                name=manifest["name"],
-                description=manifest["description"],
-                type=manifest.get("type", "model"),
-                license=manifest.get("license", "N/A"),
-                version=manifest.get("version", "0.1.0"),
-                framework=manifest.get("framework", "PyTorch"),
-                alias=alias,
-                citations=citations or "See rdf.yaml for references.",
-            )
-
-            artifact = await am.create(
-                alias=alias,
-                parent_id=COLLECTION,
-                type="model",
-                manifest=manifest,
-                config={"storage": "git"},
-                stage=True,
-                
-            )
-
-            # Upload README as a file placeholder
-            import httpx
-            put_url = await am.put_file(
-                artifact_id=artifact.id,
-                file_path="README.md",
-                
-            )
-            async with httpx.AsyncClient() as client:
-                resp = await client.put(
-                    put_url,
-                    content=readme.encode(),
-                    headers={"Content-Type": "text/markdown"},
-                )
-                resp.raise_for_status()
+    slots = asyncio.Semaphore(MAX_CONCURRENT_SEEDS)
+    # One client for every README upload so the presigned PUTs share connections.
+    async with httpx.AsyncClient() as client:
+        results = await asyncio.gather(
+            *(seed_model(am, client, model, slots) for model in MODELS),
+            return_exceptions=True,
+        )
 
-            # Commit
-            await am.commit(artifact_id=artifact.id)
-            print(f"OK  (id: {artifact.id})")
+    for model, result in zip(MODELS, results):
+        alias = model["alias"]
+        print(f"  Creating: {model['manifest']['name']} ({alias})...", end=" ")
+        if not isinstance(result, Exception):
+            print(f"OK  (id: {result})")
             created.append(alias)
+            continue
 
-        except Exception as e:
-            err_str = str(e)
-            if "already exists" in err_str.lower() or "conflict" in err_str.lower():
-                print(f"SKIP (already exists)")
-                skipped.append(alias)
-            else:
-                print(f"FAIL: {err_str}")
-                failed.append((alias, err_str))
+        err_str = str(result)
+        if "already exists" in err_str.lower() or "conflict" in err_str.lower():
+            print(f"SKIP (already exists)")
+            skipped.append(alias)
+        else:
+            print(f"FAIL: {err_str}")
+            failed.append((alias, err_str))
 
     print("\n" + "=" * 60)
     print(f"Created : {len(created)}")
@@ -3,21 +3,51 @@ import asyncio
 import base64
 import json
 import os
+import time
 import traceback
-from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any
 
 import httpx
 from hypha_rpc import connect_to_server
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+MAX_CONCURRENT_PROBES = 10
+PROBE_HEADERS = {"Accept": "application/json"}
+REQUEST_TIMEOUT_SECONDS = 30.0
+
 
 def decode_jwt_payload(token: str) -> dict:
     payload_part = token.split(".")[1]
     padding = "=" * (-len(payload_part) % 4)
     decoded_bytes = base64.urlsafe_b64decode(payload_part + padding)
+    if orjson is not None:
+        return orjson.loads(decoded_bytes)
     return json.loads(decoded_bytes)
 
 
-def parse_args() -> argparse.Namespace:
+def format_json(value: Any, sort_keys: bool = False) -> str:
+    if orjson is None:
+        return json.dumps(value, indent=2, sort_keys=sort_keys)
+    option = orjson.OPT_INDENT_2 | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+    return orjson.dumps(value, option=option).decode("utf-8")
+
+
+@lru_cache(maxsize=4)
+def format_jwt_payload(token: str) -> str:
+    # Cached as a string so repeated in-process health checks reuse it safely.
+    return format_json(decode_jwt_payload(token))
+
+
+def utc_timestamp() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Health-check a Hypha chat-proxy app")
     parser.add_argument(
         "--server-url",
@@ -79,13 +109,70 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Also perform direct HTTP probes for the same URL",
     )
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
 
 def build_service_alias(workspace: str, app_id: str) -> str:
     return f"{workspace}/default@{app_id}"
 
 
+async def probe_resolve_url(
+    proxy: Any,
+    url: str,
+    attempt: int,
+    timeout_seconds: float,
+    slots: asyncio.Semaphore,
+) -> tuple[str, str]:
+    async with slots:
+        ts = utc_timestamp()
+        try:
+            payload = await asyncio.wait_for(
+                proxy.resolve_url(
+                    url=url,
+                    method="GET",
+                    headers=PROBE_HEADERS,
+                    timeout=REQUEST_TIMEOUT_SECONDS,
+                ),
+                timeout=timeout_seconds,
+            )
+        except asyncio.TimeoutError:
+            return "timeout", f"{ts} | proxy | attempt={attempt} | timeout"
+        except Exception as exp:
+            return "exception", f"{ts} | proxy | attempt={attempt} | exception={exp}"
+
+    if not isinstance(payload, dict):
+        return (
+            "unexpected_payload",
+            f"{ts} | proxy | attempt={attempt} | unexpected_payload_type={type(payload)}",
+        )
+
+    status_code = payload.get("status_code")
+    error_text = payload.get("error") or ""
+    return (
+        str(status_code),
+        f"{ts} | proxy | attempt={attempt} | status_code={status_code} | ok={payload.get('ok')} | error={error_text}",
+    )
+
+
+async def probe_direct(
+    client: httpx.AsyncClient,
+    url: str,
+    attempt: int,
+    slots: asyncio.Semaphore,
+) -> tuple[str, str]:
+    async with slots:
+        ts = utc_timestamp()
+        try:
+            response = await client.get(url, headers=PROBE_HEADERS)
+        except Exception as exp:
+            return "exception", f"{ts} | direct | attempt={attempt} | exception={exp}"
+
+    return (
+        str(response.status_code),
+        f"{ts} | direct | attempt={attempt} | status_code={response.status_code}",
+    )
+
+
 async def run_health_check(args: argparse.Namespace) -> int:
     if not args.token:
         print("❌ Missing token. Provide --token or set HYPHA_TOKEN/RI_SCALE_TOKEN.")
@@ -93,9 +180,9 @@ async def run_health_check(args: argparse.Namespace) -> int:
 
     print(f"Using app_id: {args.app_id}")
     try:
-        payload = decode_jwt_payload(args.token)
+        formatted_payload = format_jwt_payload(args.token)
         print("Decoded JWT token payload:")
-        print(json.dumps(payload, indent=2))
+        print(formatted_payload)
     except Exception as exp:
         print(f"⚠️ Could not decode JWT payload: {exp}")
 
@@ -112,6 +199,9 @@ async def run_health_check(args: argparse.Namespace) -> int:
         print(f"❌ Failed to connect to Hypha: {exp}")
         return 1
 
+    timeout_seconds = float(args.timeout)
+    attempts = range(1, max(1, int(args.request_attempts)) + 1)
+
     try:
         print(f"Connected to workspace: {server.config.get('workspace')}")
         resolved_id = build_service_alias(args.workspace, args.app_id)
@@ -122,7 +212,7 @@ async def run_health_check(args: argparse.Namespace) -> int:
         print(f"Calling chat_completion via: {resolved_id}")
         response = await asyncio.wait_for(
             proxy.chat_completion(messages=messages, model=args.model),
-            timeout=float(args.timeout),
+            timeout=timeout_seconds,
         )
 
         if not isinstance(response, dict):
@@ -136,10 +226,15 @@ async def run_health_check(args: argparse.Namespace) -> int:
         choices = response.get("choices") or []
         if not choices:
             print("❌ chat_completion response missing choices")
-            print(json.dumps(response, indent=2))
+            print(format_json(response))
             return 1
 
-        content = str(choices[0].get("message", {}).get("content", ""))
+        try:
+            content = choices[0]["message"]["content"] or ""
+        except (KeyError, TypeError):
+            content = ""
+        if not isinstance(content, str):
+            content = str(content)
         print("Received content:")
         print(content)
 
@@ -159,73 +254,41 @@ async def run_health_check(args: argparse.Namespace) -> int:
 
             print("Probing resolve_url through Hypha app...")
             proxy_statuses: dict[str, int] = {}
-            for attempt in range(1, max(1, int(args.request_attempts)) + 1):
-                ts = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
-                try:
-                    payload = await asyncio.wait_for(
-                        proxy.resolve_url(
-                            url=args.request_url,
-                            method="GET",
-                            headers={"Accept": "application/json"},
-                            timeout=30,
-                        ),
-                        timeout=float(args.timeout),
-                    )
-                except asyncio.TimeoutError:
-                    print(f"{ts} | proxy | attempt={attempt} | timeout")
-                    proxy_statuses["timeout"] = proxy_statuses.get("timeout", 0) + 1
-                    continue
-                except Exception as exp:
-                    print(f"{ts} | proxy | attempt={attempt} | exception={exp}")
-                    proxy_statuses["exception"] = proxy_statuses.get("exception", 0) + 1
-                    continue
-
-                if not isinstance(payload, dict):
-                    print(
-                        f"{ts} | proxy | attempt={attempt} | unexpected_payload_type={type(payload)}"
-                    )
-                    proxy_statuses["unexpected_payload"] = (
-                        proxy_statuses.get("unexpected_payload", 0) + 1
+            probe_slots = asyncio.Semaphore(MAX_CONCURRENT_PROBES)
+            proxy_results = await asyncio.gather(
+                *(
+                    probe_resolve_url(
+                        proxy, args.request_url, attempt, timeout_seconds, probe_slots
                     )
-                    continue
-
-                status_code = payload.get("status_code")
-                code_key = str(status_code)
-                proxy_statuses[code_key] = proxy_statuses.get(code_key, 0) + 1
-                error_text = payload.get("error") or ""
-                print(
-                    f"{ts} | proxy | attempt={attempt} | status_code={status_code} | ok={payload.get('ok')} | error={error_text}"
+                    for attempt in attempts
                 )
+            )
+            for status_key, line in proxy_results:
+                print(line)
+                proxy_statuses[status_key] = proxy_statuses.get(status_key, 0) + 1
 
             print("Proxy resolve_url status summary:")
-            print(json.dumps(proxy_statuses, indent=2, sort_keys=True))
+            print(format_json(proxy_statuses, sort_keys=True))
 
             if args.compare_direct:
                 print("Probing direct endpoint from same client host...")
                 direct_statuses: dict[str, int] = {}
-                for attempt in range(1, max(1, int(args.request_attempts)) + 1):
-                    ts = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
-                    try:
-                        async with httpx.AsyncClient(
-                            timeout=30.0, follow_redirects=True
-                        ) as client:
-                            response = await client.get(
-                                args.request_url,
-                                headers={"Accept": "application/json"},
-                            )
-                        key = str(response.status_code)
-                        direct_statuses[key] = direct_statuses.get(key, 0) + 1
-                        print(
-                            f"{ts} | direct | attempt={attempt} | status_code={response.status_code}"
-                        )
-                    except Exception as exp:
-                        direct_statuses["exception"] = (
-                            direct_statuses.get("exception", 0) + 1
+                # One client for all attempts so probes reuse the kept-alive connection.
+                async with httpx.AsyncClient(
+                    timeout=REQUEST_TIMEOUT_SECONDS, follow_redirects=True
+                ) as client:
+                    direct_results = await asyncio.gather(
+                        *(
+                            probe_direct(client, args.request_url, attempt, probe_slots)
+                            for attempt in attempts
                         )
-                        print(f"{ts} | direct | attempt={attempt} | exception={exp}")
+                    )
+                for status_key, line in direct_results:
+                    print(line)
+                    direct_statuses[status_key] = direct_statuses.get(status_key, 0) + 1
 
                 print("Direct request status summary:")
-                print(json.dumps(direct_statuses, indent=2, sort_keys=True))
+                print(format_json(direct_statuses, sort_keys=True))
 
         return 0
     except asyncio.TimeoutError:
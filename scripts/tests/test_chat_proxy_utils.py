@@ -13,6 +13,9 @@ class ChatProxyUtilsTests(unittest.TestCase):
             slugify_branch_name("feature/chat proxy"), "feature-chat-proxy"
         )
         self.assertEqual(slugify_branch_name("___"), "branch")
+        self.assertEqual(
+            slugify_branch_name(" Fix__Chat//Proxy! v2 "), "fix-chat-proxy-v2"
+        )
 
     def test_make_dev_app_id(self):
         app_id = make_dev_app_id(
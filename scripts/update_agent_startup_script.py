@@ -25,7 +25,7 @@ def _load_env_file(env_path: Path) -> Dict[str, str]:
             continue
         key, value = line.split("=", 1)
         key = key.strip()
-        value = value.strip().strip('"').strip("'")
+        value = value.strip().strip("\"'")
         values[key] = value
     return values
 
@@ -74,21 +74,25 @@ async def _run(args: argparse.Namespace) -> None:
         artifact = await artifact_manager.read(args.artifact_id)
 
     manifest = _extract_manifest(artifact)
-    manifest["startup_script"] = startup_script
+    changed = manifest.get("startup_script") != startup_script
+    persisted_script = startup_script
 
-    await artifact_manager.edit(
-        artifact_id=args.artifact_id,
-        manifest=manifest,
-        stage=True,
-    )
-    await artifact_manager.commit(args.artifact_id)
+    if changed:
+        manifest["startup_script"] = startup_script
+
+        await artifact_manager.edit(
+            artifact_id=args.artifact_id,
+            manifest=manifest,
+            stage=True,
+        )
+        await artifact_manager.commit(args.artifact_id)
 
-    updated = await artifact_manager.read(args.artifact_id)
-    updated_manifest = _extract_manifest(updated)
-    persisted_script = updated_manifest.get("startup_script")
+        updated = await artifact_manager.read(args.artifact_id)
+        updated_manifest = _extract_manifest(updated)
+        persisted_script = updated_manifest.get("startup_script")
 
-    if not isinstance(persisted_script, str):
-        raise RuntimeError("Updated startup_script is missing or not a string.")
+        if not isinstance(persisted_script, str):
+            raise RuntimeError("Updated startup_script is missing or not a string.")
 
     if args.verify_contains and args.verify_contains not in persisted_script:
         raise RuntimeError(
@@ -100,7 +104,10 @@ async def _run(args: argparse.Namespace) -> None:
             "Verification failed: persisted startup_script content does not match source file."
         )
 
-    print("Startup script updated and verified.")
+    if changed:
+        print("Startup script updated and verified.")
+    else:
+        print("Startup script already up to date; skipped edit and commit.")
     print(f"artifact_id={args.artifact_id}")
     print(f"startup_script_path={startup_script_path}")
 